@@ -1,6 +1,23 @@
+import io
 import tkinter as tk
 from tkinter import ttk, messagebox
-from collections import Counter, defaultdict
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+# Number of recently parsed and encoded inputs kept per app.
+PARSE_CACHE_SIZE = 4
+
+# Largest total ballot count accepted, so that counts and their sums fit the
+# int64 arrays the tallies are computed with. parse_ballots divides it by the
+# most points one ballot can give under Borda, so Borda scores fit too.
+MAX_TOTAL_VOTES = int(np.iinfo(np.int64).max)
+
+# Rank-matrix size (ballots x candidates) from which IRV switches to the
+# Numba-compiled kernel, if Numba is installed. Below it the NumPy kernel takes
+# well under the ~150 ms needed just to load the cached compiled kernel.
+IRV_COMPILED_MIN_CELLS = 1_000_000
 
 
 def parse_candidates(raw: str):
@@ -12,97 +29,260 @@ def parse_candidates(raw: str):
     return candidates
 
 
-def parse_ballots(raw: str, candidates):
+def parse_ballots(lines, candidates):
+    cand_set = frozenset(candidates)
     ballots = []
-    if not raw.strip():
-        raise ValueError("Please enter at least one ballot line.")
-
-    for idx, line in enumerate(raw.splitlines(), start=1):
+    total = 0
+    max_total = MAX_TOTAL_VOTES // max(len(candidates) - 1, 1)
+    for idx, line in enumerate(lines, start=1):
         if not line.strip():
             continue
-        if ":" not in line:
+        count_text, sep, ranking_text = line.partition(":")
+        if not sep:
             raise ValueError(f"Line {idx} must be in the format 'count: ranking'.")
-        count_text, ranking_text = line.split(":", 1)
         try:
-            count = int(count_text.strip())
+            # int() already ignores surrounding whitespace.
+            count = int(count_text)
         except ValueError as exc:
             raise ValueError(f"Line {idx} has an invalid count.") from exc
         if count <= 0:
             raise ValueError(f"Line {idx} count must be positive.")
+        total += count
+        if total > max_total:
+            raise ValueError(f"Line {idx} count is too large.")
 
-        ranking = [c.strip() for c in ranking_text.replace(">", ",").split(",") if c.strip()]
+        ranking = [c for c in map(str.strip, ranking_text.replace(">", ",").split(",")) if c]
         if len(set(ranking)) != len(ranking):
             raise ValueError(f"Line {idx} ranking has duplicate candidates.")
-        unknown = [c for c in ranking if c not in candidates]
+        unknown = [c for c in ranking if c not in cand_set]
         if unknown:
             raise ValueError(f"Line {idx} contains unknown candidates: {', '.join(unknown)}.")
 
         ballots.append((count, ranking))
 
     if not ballots:
-        raise ValueError("Please enter at least one valid ballot line.")
+        raise ValueError("Please enter at least one ballot line.")
     return ballots
 
 
-def irv_winner(candidates, ballots):
-    remaining = list(candidates)
-    rounds = []
-
-    while len(remaining) > 1:
-        tally = Counter()
-        for count, ranking in ballots:
-            for choice in ranking:
-                if choice in remaining:
-                    tally[choice] += count
-                    break
-        total = sum(tally.values())
-        rounds.append((tally, total, list(remaining)))
+def _encode(ballots, candidates):
+    # Structure-of-arrays form of the ballots: counts[b] is ballot b's count and
+    # rank[b, c] is the position of candidates[c] on it. Unranked candidates get
+    # the largest value of rank's dtype, which is always >= len(candidates); a
+    # one-byte rank keeps each ballot row to m bytes for typical elections.
+    m = len(candidates)
+    dtype = np.int8 if m < np.iinfo(np.int8).max else np.int32
+    cand_idx = {c: i for i, c in enumerate(candidates)}
+    counts = np.fromiter((count for count, _ in ballots), dtype=np.int64, count=len(ballots))
+    lengths = np.fromiter((len(r) for _, r in ballots), dtype=np.intp, count=len(ballots))
+    # Scatter every ranked entry at once: row is the ballot, column the
+    # candidate, and the value its position within that ballot's ranking.
+    cols = np.fromiter(
+        (cand_idx[c] for _, ranking in ballots for c in ranking),
+        dtype=np.intp,
+        count=int(lengths.sum()),
+    )
+    rows = np.repeat(np.arange(len(ballots)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    rank = np.full((len(ballots), m), np.iinfo(dtype).max, dtype=dtype)
+    rank[rows, cols] = np.arange(cols.size) - np.repeat(starts, lengths)
+    return counts, rank
+
+
+def _irv_rounds_vectorized(counts, rank, m):
+    alive = np.ones(m, dtype=bool)
+    dropped = np.iinfo(rank.dtype).max
+    tallies, alive_rounds = [], []
+    winner = -1
+
+    while np.count_nonzero(alive) > 1:
+        remaining = np.flatnonzero(alive)
+        masked = np.where(alive, rank, dropped)
+        first = masked.argmin(axis=1)
+        # Ballots with no remaining candidate ranked are exhausted.
+        active = np.take_along_axis(masked, first[:, None], axis=1)[:, 0] < m
+        # Exact int64 tallies; float weights would round counts above 2**53.
+        tally = np.zeros(m, dtype=np.int64)
+        np.add.at(tally, first[active], counts[active])
+        tallies.append(tally)
+        alive_rounds.append(alive.copy())
+        total = tally.sum()
+        if total == 0:
+            break
+        majority = np.flatnonzero(tally > total - tally)
+        if majority.size:
+            winner = majority[0]
+            break
+        remaining_votes = tally[remaining]
+        alive[remaining[remaining_votes == remaining_votes.min()]] = False
+    if winner < 0 and alive.any():
+        winner = np.flatnonzero(alive)[0]
+    return (
+        winner,
+        np.array(tallies, dtype=np.int64).reshape(-1, m),
+        np.array(alive_rounds, dtype=bool).reshape(-1, m),
+    )
+
+
+# Same contract as _irv_rounds_vectorized, written as plain loops for Numba.
+def _irv_rounds_loop(counts, rank, m):
+    B = rank.shape[0]
+    # prefs[b, :lengths[b]] lists ballot b's ranked candidates in order.
+    prefs = np.empty((B, m), np.intp)
+    lengths = np.zeros(B, np.intp)
+    for b in range(B):
+        n = 0
+        for c in range(m):
+            if rank[b, c] < m:
+                prefs[b, rank[b, c]] = c
+                n += 1
+        lengths[b] = n
+    # head[b] indexes ballot b's highest-ranked candidate still alive.
+    head = np.zeros(B, np.intp)
+    alive = np.ones(m, np.bool_)
+    n_alive = m
+    # Every round but the last eliminates at least one candidate.
+    tallies = np.zeros((m, m), np.int64)
+    alive_rounds = np.zeros((m, m), np.bool_)
+    n_rounds = 0
+    winner = -1
+
+    while n_alive > 1:
+        tally = tallies[n_rounds]
+        alive_rounds[n_rounds] = alive
+        n_rounds += 1
+        for b in range(B):
+            # Eliminated candidates never come back, so each ballot's cursor
+            # only moves forward. Exhausted ballots run off the end and
+            # add nothing.
+            k = head[b]
+            while k < lengths[b] and not alive[prefs[b, k]]:
+                k += 1
+            head[b] = k
+            if k < lengths[b]:
+                tally[prefs[b, k]] += counts[b]
+        total = tally.sum()
         if total == 0:
             break
-        for candidate, votes in tally.items():
-            if votes > total / 2:
-                return candidate, rounds
-        lowest_votes = min(tally.values()) if tally else 0
-        eliminated = [c for c in remaining if tally.get(c, 0) == lowest_votes]
-        for candidate in eliminated:
-            remaining.remove(candidate)
-    return (remaining[0] if remaining else "No winner"), rounds
-
-
-def borda_winner(candidates, ballots):
-    scores = Counter({c: 0 for c in candidates})
-    max_points = len(candidates) - 1
-    for count, ranking in ballots:
-        for idx, candidate in enumerate(ranking):
-            scores[candidate] += count * (max_points - idx)
-    return scores
-
-
-def condorcet_winner(candidates, ballots):
-    pairwise = defaultdict(lambda: defaultdict(int))
-    for count, ranking in ballots:
-        for i, winner in enumerate(ranking):
-            for loser in ranking[i + 1:]:
-                pairwise[winner][loser] += count
-    victories = Counter()
-    for a in candidates:
-        for b in candidates:
-            if a == b:
-                continue
-            if pairwise[a][b] > pairwise[b][a]:
-                victories[a] += 1
-    winner = None
-    for candidate in candidates:
-        if victories[candidate] == len(candidates) - 1:
-            winner = candidate
+        # No alive tally exceeds the total, so it is a safe starting minimum.
+        lowest = total
+        for c in range(m):
+            if tally[c] > total - tally[c]:
+                winner = c
+            if alive[c] and tally[c] < lowest:
+                lowest = tally[c]
+        if winner >= 0:
             break
-    return winner, pairwise, victories
+        for c in range(m):
+            if alive[c] and tally[c] == lowest:
+                alive[c] = False
+                n_alive -= 1
+    if winner < 0:
+        for c in range(m):
+            if alive[c]:
+                winner = c
+                break
+    return winner, tallies[:n_rounds], alive_rounds[:n_rounds]
+
+
+@lru_cache(maxsize=None)
+def _compiled_irv_rounds():
+    # Numba is optional. It is imported, and _irv_rounds_loop compiled (or
+    # loaded from Numba's on-disk cache), only when an election first needs it:
+    # a cold compile blocks for a few seconds.
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_irv_rounds_loop)
+
+
+def irv_winner_np(counts, rank, candidates):
+    kernel = _irv_rounds_vectorized
+    if rank.size >= IRV_COMPILED_MIN_CELLS:
+        kernel = _compiled_irv_rounds() or _irv_rounds_vectorized
+    winner, tallies, alive_rounds = kernel(counts, rank, len(candidates))
+    rounds = []
+    for tally, alive in zip(tallies, alive_rounds):
+        # Indices of the remaining candidates, in original candidate order.
+        remaining = np.flatnonzero(alive)
+        rounds.append((
+            Counter({candidates[c]: int(tally[c]) for c in remaining if tally[c]}),
+            int(tally.sum()),
+            [candidates[c] for c in remaining],
+        ))
+    return (candidates[winner] if winner >= 0 else "No winner"), rounds
+
+
+@lru_cache(maxsize=None)
+def _borda_points(m):
+    # Borda points for every non-negative int8 rank with m candidates, so scoring
+    # an int8 rank matrix is a single table lookup; the unranked sentinel and
+    # any other position >= m score zero.
+    table = np.maximum(m - 1 - np.arange(np.iinfo(np.int8).max + 1, dtype=np.int64), 0)
+    table.flags.writeable = False
+    return table
+
+
+def borda_winner_np(counts, rank, candidates):
+    m = len(candidates)
+    if rank.dtype == np.int8:
+        points = _borda_points(m)[rank]
+    else:
+        # The unranked sentinel is >= len(candidates), so it clips to zero points.
+        points = np.maximum(m - 1 - rank.astype(np.int64), 0)
+    scores = points.T @ counts
+    return Counter(dict(zip(candidates, scores.tolist())))
+
+
+def pairwise_matrix(counts, rank):
+    m = rank.shape[1]
+    # P[i, j] is the number of voters ranking candidates[i] above candidates[j];
+    # a candidate left unranked on a ballot takes no part in that ballot's pairs.
+    # One row at a time keeps the temporaries at B x m rather than B x m x m.
+    ranked = rank < m
+    P = np.zeros((m, m), dtype=np.int64)
+    for i in range(m):
+        P[i] = np.einsum("b,bj->j", counts, (rank[:, i:i + 1] < rank) & ranked)
+    return P
+
+
+def condorcet_winner_np(P, candidates):
+    m = len(candidates)
+    wins = P > P.T
+    victories_vec = wins.sum(axis=1)
+    # Copeland: one point per pairwise win, half a point per tie (minus the
+    # self-tie on the diagonal).
+    copeland_vec = victories_vec + 0.5 * (P == P.T).sum(axis=1) - 0.5
+    victories = Counter({c: int(v) for c, v in zip(candidates, victories_vec) if v})
+    copeland = Counter(dict(zip(candidates, copeland_vec.tolist())))
+    if m <= 64:
+        # Bit j of beats[i] is set when candidates[i] beats candidates[j]; the
+        # Condorcet winner's row has every bit set except its own.
+        bits = np.left_shift(np.uint64(1), np.arange(m, dtype=np.uint64))
+        beats = wins.astype(np.uint64) @ bits
+        idx = np.flatnonzero(beats == (np.uint64((1 << m) - 1) ^ bits))
+    else:
+        idx = np.flatnonzero(victories_vec == m - 1)
+    winner = candidates[idx[0]] if idx.size else None
+    return winner, victories, copeland
+
+
+def schulze_winner(P, candidates):
+    # Strongest beatpaths (Floyd-Warshall over winning-vote strengths).
+    strength = np.where(P > P.T, P, 0)
+    for k in range(len(candidates)):
+        strength = np.maximum(strength, np.minimum(strength[:, k:k + 1], strength[k:k + 1, :]))
+    scores = Counter(dict(zip(candidates, (strength > strength.T).sum(axis=1).tolist())))
+    winners = [candidates[i] for i in np.flatnonzero((strength >= strength.T).all(axis=1))]
+    return winners, scores
 
 
 class VotingApp(ttk.Frame):
     def __init__(self, master):
         super().__init__(master)
         self.pack(fill=tk.BOTH, expand=True)
+        self._parse_cache = OrderedDict()
         self.create_widgets()
 
     def create_widgets(self):
@@ -144,6 +324,8 @@ class VotingApp(ttk.Frame):
         self.irv_var = tk.BooleanVar(value=True)
         self.borda_var = tk.BooleanVar(value=True)
         self.condorcet_var = tk.BooleanVar(value=True)
+        self.copeland_var = tk.BooleanVar(value=False)
+        self.schulze_var = tk.BooleanVar(value=False)
 
         ttk.Checkbutton(options_frame, text="Instant Runoff (IRV)", variable=self.irv_var).pack(
             anchor="w", padx=5, pady=2
@@ -154,6 +336,12 @@ class VotingApp(ttk.Frame):
         ttk.Checkbutton(options_frame, text="Condorcet (pairwise)", variable=self.condorcet_var).pack(
             anchor="w", padx=5, pady=2
         )
+        ttk.Checkbutton(options_frame, text="Copeland", variable=self.copeland_var).pack(
+            anchor="w", padx=5, pady=2
+        )
+        ttk.Checkbutton(options_frame, text="Schulze (beatpath)", variable=self.schulze_var).pack(
+            anchor="w", padx=5, pady=2
+        )
 
         action_frame = ttk.Frame(self)
         action_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -166,68 +354,104 @@ class VotingApp(ttk.Frame):
 
         self.output = tk.Text(self, height=16)
         self.output.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-        self.output.insert("1.0", "Simulation results will appear here.\n")
-        self.output.config(state=tk.DISABLED)
+        self._set_output("Simulation results will appear here.\n")
 
-    def clear_output(self):
+    def _set_output(self, text):
+        # Swap the whole read-only output in a single Text.replace call.
         self.output.config(state=tk.NORMAL)
-        self.output.delete("1.0", tk.END)
+        self.output.replace("1.0", tk.END, text)
         self.output.config(state=tk.DISABLED)
 
-    def run_simulation(self):
-        try:
-            candidates = parse_candidates(self.candidates_entry.get())
-            ballots = parse_ballots(self.ballots_text.get("1.0", tk.END), candidates)
-        except ValueError as exc:
-            messagebox.showerror("Input Error", str(exc))
-            return
+    def clear_output(self):
+        self._set_output("")
 
-        if not (self.irv_var.get() or self.borda_var.get() or self.condorcet_var.get()):
+    def run_simulation(self):
+        # One Tcl round trip for the whole buffer; the string doubles as cache key.
+        key = (self.candidates_entry.get(), self.ballots_text.get("1.0", "end-1c"))
+        if key in self._parse_cache:
+            self._parse_cache.move_to_end(key)
+            candidates, counts, rank = self._parse_cache[key]
+        else:
+            try:
+                candidates = tuple(parse_candidates(key[0]))
+                counts, rank = _encode(parse_ballots(key[1].splitlines(), candidates), candidates)
+            except ValueError as exc:
+                messagebox.showerror("Input Error", str(exc))
+                return
+            self._parse_cache[key] = (candidates, counts, rank)
+            if len(self._parse_cache) > PARSE_CACHE_SIZE:
+                self._parse_cache.popitem(last=False)
+
+        if not (
+            self.irv_var.get()
+            or self.borda_var.get()
+            or self.condorcet_var.get()
+            or self.copeland_var.get()
+            or self.schulze_var.get()
+        ):
             messagebox.showwarning("No Systems Selected", "Select at least one voting system.")
             return
 
-        report_lines = []
-        total_votes = sum(count for count, _ in ballots)
-        report_lines.append(f"Total ballots: {total_votes}")
-        report_lines.append("")
+        buf = io.StringIO()
+        total_votes = int(counts.sum())
+        buf.write(f"Total ballots: {total_votes}\n")
+        buf.write("\n")
 
         if self.irv_var.get():
-            winner, rounds = irv_winner(candidates, ballots)
-            report_lines.append("Instant Runoff (IRV)")
+            winner, rounds = irv_winner_np(counts, rank, candidates)
+            buf.write("Instant Runoff (IRV)\n")
             for idx, (tally, total, remaining) in enumerate(rounds, start=1):
-                report_lines.append(f"  Round {idx} (remaining: {', '.join(remaining)}):")
+                buf.write(f"  Round {idx} (remaining: {', '.join(remaining)}):\n")
                 for candidate in remaining:
-                    report_lines.append(f"    {candidate}: {tally.get(candidate, 0)}")
-                report_lines.append(f"    Total counted: {total}")
-            report_lines.append(f"  Winner: {winner}")
-            report_lines.append("")
+                    buf.write(f"    {candidate}: {tally.get(candidate, 0)}\n")
+                buf.write(f"    Total counted: {total}\n")
+            buf.write(f"  Winner: {winner}\n")
+            buf.write("\n")
 
         if self.borda_var.get():
-            scores = borda_winner(candidates, ballots)
-            report_lines.append("Borda Count")
+            scores = borda_winner_np(counts, rank, candidates)
+            buf.write("Borda Count\n")
             for candidate, score in scores.most_common():
-                report_lines.append(f"  {candidate}: {score} points")
+                buf.write(f"  {candidate}: {score} points\n")
             top_score = scores.most_common(1)[0][0] if scores else "No winner"
-            report_lines.append(f"  Winner: {top_score}")
-            report_lines.append("")
+            buf.write(f"  Winner: {top_score}\n")
+            buf.write("\n")
+
+        if self.condorcet_var.get() or self.copeland_var.get() or self.schulze_var.get():
+            P = pairwise_matrix(counts, rank)
+
+        if self.condorcet_var.get() or self.copeland_var.get():
+            winner, victories, copeland = condorcet_winner_np(P, candidates)
 
         if self.condorcet_var.get():
-            winner, pairwise, victories = condorcet_winner(candidates, ballots)
-            report_lines.append("Condorcet (pairwise)")
+            buf.write("Condorcet (pairwise)\n")
             for candidate in candidates:
-                report_lines.append(
-                    f"  {candidate}: {victories[candidate]} pairwise wins"
-                )
+                buf.write(f"  {candidate}: {victories[candidate]} pairwise wins\n")
             if winner:
-                report_lines.append(f"  Condorcet winner: {winner}")
+                buf.write(f"  Condorcet winner: {winner}\n")
             else:
-                report_lines.append("  No Condorcet winner found.")
-            report_lines.append("")
+                buf.write("  No Condorcet winner found.\n")
+            buf.write("\n")
+
+        if self.copeland_var.get():
+            buf.write("Copeland\n")
+            for candidate, score in copeland.most_common():
+                buf.write(f"  {candidate}: {score:g} points\n")
+            top_score = copeland.most_common(1)[0][0] if copeland else "No winner"
+            buf.write(f"  Winner: {top_score}\n")
+            buf.write("\n")
+
+        if self.schulze_var.get():
+            winners, scores = schulze_winner(P, candidates)
+            buf.write("Schulze (beatpath)\n")
+            for candidate, score in scores.most_common():
+                buf.write(f"  {candidate}: {score} beatpath wins\n")
+            buf.write(f"  Winner: {', '.join(winners)}\n")
+            buf.write("\n")
 
-        self.output.config(state=tk.NORMAL)
-        self.output.delete("1.0", tk.END)
-        self.output.insert("1.0", "\n".join(report_lines))
-        self.output.config(state=tk.DISABLED)
+        # Every section ends with a blank separator line; drop the newline after
+        # the last one so the report ends exactly as the old "\n".join did.
+        self._set_output(buf.getvalue()[:-1])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+import random
+import unittest
+from collections import Counter
+from unittest import mock
+
+import numpy as np
+
+import main
+
+
+def reference_irv(candidates, ballots):
+    # The original list-based IRV, with elimination taken over every remaining
+    # candidate (including those with no first-preference votes).
+    remaining = list(candidates)
+    rounds = []
+
+    while len(remaining) > 1:
+        tally = Counter()
+        for count, ranking in ballots:
+            for choice in ranking:
+                if choice in remaining:
+                    tally[choice] += count
+                    break
+        total = sum(tally.values())
+        rounds.append((tally, total, list(remaining)))
+        if total == 0:
+            break
+        for candidate, votes in tally.items():
+            if votes > total / 2:
+                return candidate, rounds
+        lowest_votes = min(tally.get(c, 0) for c in remaining)
+        eliminated = [c for c in remaining if tally.get(c, 0) == lowest_votes]
+        for candidate in eliminated:
+            remaining.remove(candidate)
+    return (remaining[0] if remaining else "No winner"), rounds
+
+
+def reference_pairwise(candidates, ballots):
+    # The original nested-dict pairwise count, as a list-of-lists matrix.
+    pairwise = {a: Counter() for a in candidates}
+    for count, ranking in ballots:
+        for i, winner in enumerate(ranking):
+            for loser in ranking[i + 1:]:
+                pairwise[winner][loser] += count
+    return [[pairwise[a][b] for b in candidates] for a in candidates]
+
+
+def reference_schulze(candidates, P):
+    # The textbook triple-loop strongest-path computation.
+    m = len(candidates)
+    d = [[P[i][j] if P[i][j] > P[j][i] else 0 for j in range(m)] for i in range(m)]
+    for i in range(m):
+        for j in range(m):
+            if i != j:
+                for k in range(m):
+                    if i != k and j != k:
+                        d[j][k] = max(d[j][k], min(d[j][i], d[i][k]))
+    winners = [
+        candidates[i] for i in range(m) if all(d[i][j] >= d[j][i] for j in range(m) if j != i)
+    ]
+    scores = Counter({
+        candidates[i]: sum(d[i][j] > d[j][i] for j in range(m) if j != i) for i in range(m)
+    })
+    return winners, scores
+
+
+def reference_borda(candidates, ballots):
+    # The original per-ballot Borda count.
+    scores = Counter({c: 0 for c in candidates})
+    max_points = len(candidates) - 1
+    for count, ranking in ballots:
+        for idx, candidate in enumerate(ranking):
+            scores[candidate] += count * (max_points - idx)
+    return scores
+
+
+def random_elections(seed, n=300):
+    rng = random.Random(seed)
+    for _ in range(n):
+        m = rng.randint(1, 7)
+        candidates = [f"C{i}" for i in range(m)]
+        # Short and empty rankings produce exhausted ballots; small counts
+        # produce tied eliminations.
+        ballots = [
+            (rng.randint(1, 4), rng.sample(candidates, rng.randint(0, m)))
+            for _ in range(rng.randint(1, 10))
+        ]
+        yield candidates, ballots
+
+
+class IrvKernelTests(unittest.TestCase):
+    def irv(self, candidates, ballots):
+        counts, rank = main._encode(ballots, candidates)
+        return main.irv_winner_np(counts, rank, candidates)
+
+    def check_against_reference(self):
+        for candidates, ballots in random_elections(seed=0):
+            with self.subTest(candidates=candidates, ballots=ballots):
+                self.assertEqual(self.irv(candidates, ballots), reference_irv(candidates, ballots))
+
+    def check_zero_vote_elimination(self):
+        candidates = ["A", "B", "C", "D"]
+        winner, rounds = self.irv(candidates, [(6, ["A"]), (5, ["B"]), (4, ["D", "B"])])
+        self.assertEqual([r[2] for r in rounds], [["A", "B", "C", "D"], ["A", "B", "D"], ["A", "B"]])
+        self.assertEqual(winner, "B")
+        # A candidate nobody voted for is knocked out first, not left to win.
+        winner, rounds = self.irv(["A", "B", "C"], [(5, ["A"]), (5, ["B"])])
+        self.assertEqual([r[2] for r in rounds], [["A", "B", "C"], ["A", "B"]])
+        self.assertEqual(winner, "No winner")
+
+    def check_large_counts(self):
+        # Above 2**53 a float tally would round A's lead away.
+        winner, rounds = self.irv(["A", "B"], [(2**53 + 1, ["A"]), (2**53, ["B"])])
+        self.assertEqual(winner, "A")
+        self.assertEqual(rounds[0][0], Counter({"A": 2**53 + 1, "B": 2**53}))
+        self.assertEqual(rounds[0][1], 2**54 + 1)
+
+    def test_vectorized_kernel(self):
+        with mock.patch.object(main, "IRV_COMPILED_MIN_CELLS", float("inf")):
+            self.check_against_reference()
+            self.check_zero_vote_elimination()
+            self.check_large_counts()
+
+    def test_loop_kernel(self):
+        # The kernel Numba compiles, run here as plain Python.
+        with mock.patch.object(main, "IRV_COMPILED_MIN_CELLS", 0), mock.patch.object(
+            main, "_compiled_irv_rounds", lambda: main._irv_rounds_loop
+        ):
+            self.check_against_reference()
+            self.check_zero_vote_elimination()
+            self.check_large_counts()
+
+    @unittest.skipIf(main._compiled_irv_rounds() is None, "Numba is not installed")
+    def test_compiled_kernel(self):
+        with mock.patch.object(main, "IRV_COMPILED_MIN_CELLS", 0):
+            self.check_against_reference()
+            self.check_zero_vote_elimination()
+            self.check_large_counts()
+
+
+class ParseBallotsTests(unittest.TestCase):
+    def test_count_too_large(self):
+        with self.assertRaisesRegex(ValueError, "Line 1 count is too large"):
+            main.parse_ballots(["99999999999999999999: Alice"], ["Alice"])
+
+    def test_running_total_too_large(self):
+        lines = [f"{main.MAX_TOTAL_VOTES}: Alice", "1: Bob"]
+        with self.assertRaisesRegex(ValueError, "Line 2 count is too large"):
+            main.parse_ballots(lines, ["Alice", "Bob"])
+
+    def test_largest_total_is_accepted(self):
+        ballots = main.parse_ballots([f"{main.MAX_TOTAL_VOTES}: Alice"], ["Alice"])
+        counts, _ = main._encode(ballots, ["Alice"])
+        self.assertEqual(int(counts.sum()), main.MAX_TOTAL_VOTES)
+
+    def test_total_bounded_by_borda_points(self):
+        candidates = ["A", "B", "C"]
+        limit = main.MAX_TOTAL_VOTES // 2
+        with self.assertRaisesRegex(ValueError, "Line 2 count is too large"):
+            main.parse_ballots([f"{limit}: A > B", "1: B"], candidates)
+
+        ballots = main.parse_ballots([f"{limit - 1}: A > B", "1: B > C > A"], candidates)
+        counts, rank = main._encode(ballots, candidates)
+        self.assertEqual(int(counts.sum()), limit)
+        self.assertEqual(
+            main.borda_winner_np(counts, rank, candidates),
+            Counter({"A": 2 * (limit - 1), "B": limit - 1 + 2, "C": 1}),
+        )
+        P = main.pairwise_matrix(counts, rank)
+        self.assertEqual(P.tolist(), [[0, limit - 1, 0], [1, 0, 1], [1, 0, 0]])
+
+
+class SchulzeTests(unittest.TestCase):
+    def test_against_reference(self):
+        for candidates, ballots in random_elections(seed=1, n=1000):
+            with self.subTest(candidates=candidates, ballots=ballots):
+                P = main.pairwise_matrix(*main._encode(ballots, candidates))
+                winners, scores = main.schulze_winner(P, candidates)
+                ref_winners, ref_scores = reference_schulze(
+                    candidates, reference_pairwise(candidates, ballots)
+                )
+                self.assertEqual(winners, ref_winners)
+                self.assertEqual(+scores, +ref_scores)
+
+
+class CopelandTests(unittest.TestCase):
+    def copeland(self, candidates, ballots):
+        P = main.pairwise_matrix(*main._encode(ballots, candidates))
+        return main.condorcet_winner_np(P, candidates)[2]
+
+    def test_pairwise_tie_scores_half(self):
+        # A and B tie head to head; both beat C.
+        scores = self.copeland(["A", "B", "C"], [(1, ["A", "B", "C"]), (1, ["B", "A", "C"])])
+        self.assertEqual(scores, Counter({"A": 1.5, "B": 1.5, "C": 0.0}))
+
+    def test_unranked_pairs_tie(self):
+        # C is never ranked, so both of its pairs are 0-0 ties.
+        scores = self.copeland(["A", "B", "C"], [(2, ["A", "B"])])
+        self.assertEqual(scores, Counter({"A": 1.5, "B": 0.5, "C": 1.0}))
+
+    def test_self_tie_is_not_counted(self):
+        self.assertEqual(self.copeland(["A"], [(3, ["A"])]), Counter({"A": 0.0}))
+
+
+class CondorcetBitmaskTests(unittest.TestCase):
+    def elections(self, m):
+        rng = random.Random(m)
+        candidates = [f"C{i}" for i in range(m)]
+        for _ in range(20):
+            yield candidates, [
+                (rng.randint(1, 4), rng.sample(candidates, rng.randint(0, m)))
+                for _ in range(rng.randint(1, 6))
+            ]
+        # Force a Condorcet winner at each end of the bitmask.
+        for top in {candidates[0], candidates[-1]}:
+            others = [c for c in candidates if c != top]
+            yield candidates, [(2, [top] + rng.sample(others, m - 1)), (1, rng.sample(candidates, m))]
+
+    def test_matches_victory_count(self):
+        for m in (1, 2, 64, 65):
+            found = 0
+            for candidates, ballots in self.elections(m):
+                with self.subTest(m=m, ballots=ballots):
+                    P = main.pairwise_matrix(*main._encode(ballots, candidates))
+                    expected = np.flatnonzero((P > P.T).sum(axis=1) == m - 1)
+                    winner = main.condorcet_winner_np(P, candidates)[0]
+                    self.assertEqual(winner, candidates[expected[0]] if expected.size else None)
+                    found += winner is not None
+            self.assertGreater(found, 0)
+
+
+class EncodedTallyTests(unittest.TestCase):
+    def check(self, elections, dtype):
+        for candidates, ballots in elections:
+            with self.subTest(candidates=candidates, ballots=ballots):
+                counts, rank = main._encode(ballots, candidates)
+                self.assertEqual(rank.dtype, dtype)
+                self.assertEqual(
+                    main.borda_winner_np(counts, rank, candidates),
+                    reference_borda(candidates, ballots),
+                )
+                self.assertEqual(
+                    main.pairwise_matrix(counts, rank).tolist(),
+                    reference_pairwise(candidates, ballots),
+                )
+
+    def test_int8_rank(self):
+        self.check(random_elections(seed=2), np.int8)
+
+    def test_int32_rank(self):
+        rng = random.Random(3)
+        candidates = [f"C{i}" for i in range(130)]
+        elections = [
+            (candidates, [
+                (rng.randint(1, 4), rng.sample(candidates, rng.randint(0, 130)))
+                for _ in range(rng.randint(1, 6))
+            ])
+            for _ in range(10)
+        ]
+        self.check(elections, np.int32)
+
+
+if __name__ == "__main__":
+    unittest.main()